@@ -1,20 +1,62 @@
 import os
-from fastapi import FastAPI, HTTPException
+import re
+import asyncio
+import hashlib
+import hmac
+import orjson
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from fastapi import FastAPI, HTTPException, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
+from redis import asyncio as aioredis
 from pydantic import BaseModel, Field
-from typing import List, Optional, Literal, Dict, Any
+from types import MappingProxyType
+from typing import List, Optional, Literal, Dict, Any, Mapping, Sequence
 from bson import ObjectId
+from pymongo import IndexModel, ReturnDocument, UpdateOne
 
 from database import db, create_document, get_documents
 
-app = FastAPI(title="Clothing Shop API")
+
+
+CATALOG_CACHE_NAMESPACE = "catalog"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    redis_url = os.getenv("REDIS_URL")
+    redis = aioredis.from_url(redis_url) if redis_url else None
+    # Open Mongo and Redis connections before the first request rather than on it
+    warmups = []
+    if db is not None:
+        warmups.append(db.command("ping"))
+    if redis is not None:
+        warmups.append(redis.ping())
+    await asyncio.gather(*warmups)
+    FastAPICache.init(RedisBackend(redis) if redis is not None else InMemoryBackend(), prefix="shop")
+    await seed_database()
+    yield
+    if redis is not None:
+        await redis.aclose()
+
+
+app = FastAPI(title="Clothing Shop API", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+FRONTEND_ORIGINS = [o.strip() for o in os.getenv("FRONTEND_ORIGIN", "https://shop.example.com").split(",") if o.strip()]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=FRONTEND_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["content-type", "authorization", "x-admin-token"],
+    expose_headers=["X-Total-Count"],
+    max_age=86400,
 )
 
 
@@ -34,24 +76,61 @@ class PyObjectId(ObjectId):
             raise ValueError("Invalid ObjectId")
 
 
+_OID_RE = re.compile(r"[0-9a-fA-F]{24}")
+
+
+@lru_cache(maxsize=4096)
+def _oid(s: str) -> ObjectId:
+    # Hot product ids are parsed once; callers validate against _OID_RE first
+    return ObjectId(s)
+
+
 def serialize_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
+    # Mutates in place: only _id is ObjectId-typed in the stored schemas
     if not doc:
         return doc
-    out = {**doc}
-    if "_id" in out:
-        out["id"] = str(out.pop("_id"))
-    # Convert nested ids if any
-    for k, v in list(out.items()):
-        if isinstance(v, ObjectId):
-            out[k] = str(v)
-    return out
+    doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+def catalog_key_builder(func, namespace: str = "", *, request=None, response=None, args=(), kwargs=None):
+    # Key only on catalog filters; never on cart ids or customer data
+    kwargs = kwargs or {}
+    params = "&".join(f"{k}={kwargs.get(k) or ''}" for k in ("category", "q", "skip", "limit"))
+    # Same prefix:namespace layout as fastapi-cache's default builder, so clear() finds these keys
+    return f"{FastAPICache.get_prefix()}:{namespace}:{func.__name__}:{params}"
+
+
+CATALOG_CACHE_CONTROL = "public, max-age=60"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/ prefixes are ignored and * matches any ETag
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def conditional_json(request: Request, content: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    # Strong ETag over the encoded body; a matching If-None-Match gets a bodiless 304
+    body = orjson.dumps(content)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def invalidate_catalog_cache():
+    await FastAPICache.clear(namespace=CATALOG_CACHE_NAMESPACE)
 
 
 # ---------- Schemas ----------
 class ProductIn(BaseModel):
     title: str
     description: Optional[str] = None
-    price: float = Field(..., ge=0)
+    price_cents: int = Field(..., ge=0)
     category: str
     images: List[str] = []
     sizes: List[Literal["XS", "S", "M", "L", "XL", "XXL"]] = ["S", "M", "L"]
@@ -72,7 +151,7 @@ class CartItem(BaseModel):
     product_id: str
     size: Literal["XS", "S", "M", "L", "XL", "XXL"]
     quantity: int = Field(1, ge=1)
-    price_snapshot: float
+    price_cents_snapshot: int
     title_snapshot: Optional[str] = None
     image_snapshot: Optional[str] = None
 
@@ -94,17 +173,18 @@ class CustomerInfo(BaseModel):
 class Order(BaseModel):
     cart_id: str
     items: List[CartItem]
-    total: float
+    total_cents: int
     customer: CustomerInfo
     status: Literal["received", "processing", "shipped", "delivered"] = "received"
 
 
 # ---------- Seed Data ----------
-SEED_PRODUCTS = [
+# Read-only: insert_many adds _id to the dicts it is given, so seeding inserts copies
+SEED_PRODUCTS = tuple(MappingProxyType(p) for p in [
     {
         "title": "Classic Logo Tee",
         "description": "Premium cotton t-shirt with embroidered logo.",
-        "price": 29.0,
+        "price_cents": 2900,
         "category": "t-shirts",
         "images": [
             "https://images.unsplash.com/photo-1523381294911-8d3cead13475?q=80&w=1200&auto=format&fit=crop",
@@ -116,7 +196,7 @@ SEED_PRODUCTS = [
     {
         "title": "Heavyweight Hoodie",
         "description": "Ultra-soft fleece hoodie for everyday comfort.",
-        "price": 69.0,
+        "price_cents": 6900,
         "category": "hoodies",
         "images": [
             "https://images.unsplash.com/photo-1516826957135-700dedea698c?q=80&w=1200&auto=format&fit=crop",
@@ -128,7 +208,7 @@ SEED_PRODUCTS = [
     {
         "title": "Tapered Joggers",
         "description": "Athleisure joggers with tapered fit.",
-        "price": 59.0,
+        "price_cents": 5900,
         "category": "pants",
         "images": [
             "https://images.unsplash.com/photo-1548883354-7622d3ecb4c5?q=80&w=1200&auto=format&fit=crop",
@@ -137,25 +217,56 @@ SEED_PRODUCTS = [
         "in_stock": True,
         "brand": "Flames Co.",
     },
-]
+])
 
-SEED_CATEGORIES = [
+SEED_CATEGORIES = tuple(MappingProxyType(c) for c in [
     {"name": "T-Shirts", "slug": "t-shirts"},
     {"name": "Hoodies", "slug": "hoodies"},
     {"name": "Pants", "slug": "pants"},
+])
+
+
+PRODUCT_INDEXES = [
+    # Text index backing /api/products?q=
+    IndexModel([("title", "text"), ("description", "text")], name="product_text"),
+    # Category listings and anchored title-prefix searches
+    IndexModel([("category", 1), ("in_stock", 1)]),
+    # Unique so concurrent seeding from several workers can't duplicate products
+    IndexModel([("title", 1)], unique=True),
+]
+
+CATEGORY_INDEXES = [
+    IndexModel([("slug", 1)], unique=True),
+]
+
+CART_INDEXES = [
+    # Every cart operation filters on cart_id; unique so upserts can't create a second cart
+    IndexModel([("cart_id", 1)], unique=True),
 ]
 
 
-@app.on_event("startup")
-def seed_database():
+async def seed_collection(name: str, docs: Sequence[Mapping[str, Any]], key: str):
+    # Every worker seeds on startup; upserts on a uniquely indexed key make that idempotent
+    if await db[name].estimated_document_count() == 0:
+        await db[name].bulk_write(
+            [UpdateOne({key: d[key]}, {"$setOnInsert": dict(d)}, upsert=True) for d in docs],
+            ordered=False,
+        )
+
+
+async def seed_database():
     if db is None:
         return
-    # Seed categories
-    if db["category"].count_documents({}) == 0:
-        db["category"].insert_many(SEED_CATEGORIES)
-    # Seed products
-    if db["product"].count_documents({}) == 0:
-        db["product"].insert_many(SEED_PRODUCTS)
+    # Unique indexes must exist before the seeding upserts rely on them
+    await asyncio.gather(
+        db["product"].create_indexes(PRODUCT_INDEXES),
+        db["category"].create_indexes(CATEGORY_INDEXES),
+        db["cart"].create_indexes(CART_INDEXES),
+    )
+    await asyncio.gather(
+        seed_collection("category", SEED_CATEGORIES, "slug"),
+        seed_collection("product", SEED_PRODUCTS, "title"),
+    )
 
 
 # ---------- Health ----------
@@ -174,55 +285,123 @@ def health():
 
 
 # ---------- Products ----------
-@app.get("/api/products", response_model=List[Product])
-def list_products(category: Optional[str] = None, q: Optional[str] = None):
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database not available")
+MAX_PAGE_SIZE = 200
+
+
+@cache(expire=300, namespace=CATALOG_CACHE_NAMESPACE, key_builder=catalog_key_builder)
+async def find_products(category: Optional[str], q: Optional[str], skip: int, limit: int) -> Dict[str, Any]:
     query: Dict[str, Any] = {}
     if category:
         query["category"] = category
-    if q:
-        query["title"] = {"$regex": q, "$options": "i"}
-    docs = list(db["product"].find(query))
-    return [Product(**serialize_doc(d)) for d in docs]
+    # _id keeps page boundaries stable across skip/limit requests
+    sort: List[Any] = [("_id", 1)]
+    if q and q.endswith("*"):
+        # Trailing wildcard requests prefix semantics. User input is escaped and
+        # anchored so it can't inject a pattern; being case-insensitive, it is
+        # answered by scanning title index keys rather than a bounded seek
+        prefix = q.rstrip("*")
+        if prefix:
+            query["title"] = {"$regex": f"^{re.escape(prefix)}", "$options": "i"}
+    elif q:
+        query["$text"] = {"$search": q}
+        sort = [("score", {"$meta": "textScore"}), ("_id", 1)]
+    # Sorting on textScore needs no projection (MongoDB 4.4+), so the score stays out of the payload
+    cursor = db["product"].find(query).sort(sort).skip(skip).limit(limit).batch_size(50)
+    if query:
+        docs, total = await cursor.to_list(length=limit), None
+    else:
+        # Collection metadata only; a filtered count would scan every match
+        docs, total = await asyncio.gather(cursor.to_list(length=limit), db["product"].estimated_document_count())
+    return {"items": [serialize_doc(d) for d in docs], "total": total}
+
+
+# Documents are returned as stored; skipping response_model avoids a second validation pass
+@app.get("/api/products", response_model=None)
+async def list_products(
+    request: Request,
+    category: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100),
+    skip: int = 0,
+    limit: int = 50,
+):
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not available")
+    skip = max(skip, 0)
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    page = await find_products(category=category, q=q, skip=skip, limit=limit)
+    headers = {} if page["total"] is None else {"X-Total-Count": str(page["total"])}
+    return conditional_json(request, page["items"], headers)
 
 
 @app.get("/api/products/{product_id}", response_model=Product)
-def get_product(product_id: str):
+async def get_product(product_id: str):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
-    try:
-        doc = db["product"].find_one({"_id": ObjectId(product_id)})
-    except Exception:
+    if not _OID_RE.fullmatch(product_id):
         raise HTTPException(status_code=400, detail="Invalid product id")
+    doc = await db["product"].find_one({"_id": _oid(product_id)})
     if not doc:
         raise HTTPException(status_code=404, detail="Product not found")
     return Product(**serialize_doc(doc))
 
 
 # ---------- Categories ----------
-@app.get("/api/categories", response_model=List[Category])
-def get_categories():
+@cache(expire=3600, namespace=CATALOG_CACHE_NAMESPACE, key_builder=catalog_key_builder)
+async def find_categories() -> List[Dict[str, Any]]:
+    # Projected to the Category fields, so documents go out as-is
+    return await db["category"].find({}, {"_id": 0, "name": 1, "slug": 1}).to_list(length=None)
+
+
+@app.get("/api/categories", response_model=None)
+async def get_categories(request: Request):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
-    return [Category(**{k: v for k, v in d.items() if k in ["name", "slug"]}) for d in db["category"].find({})]
+    return conditional_json(request, await find_categories())
+
+
+# ---------- Admin ----------
+@app.post("/api/admin/cache/clear")
+async def clear_catalog_cache(x_admin_token: Optional[str] = Header(None)):
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token or not hmac.compare_digest(x_admin_token or "", admin_token):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    await invalidate_catalog_cache()
+    return {"status": "cleared"}
 
 
 # ---------- Cart ----------
-@app.get("/api/cart/{cart_id}", response_model=Cart)
-def get_cart(cart_id: str):
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database not available")
-    cart = db["cart"].find_one({"cart_id": cart_id})
-    if not cart:
-        cart_doc = {"cart_id": cart_id, "items": []}
-        db["cart"].insert_one(cart_doc)
-        cart = cart_doc
+CART_ITEMS_PROJECTION = {"_id": 0, "items": 1}
+
+
+def cart_from_doc(cart_id: str, cart: Dict[str, Any]) -> Cart:
     # Ensure schema compatibility
     items = cart.get("items", [])
     return Cart(cart_id=cart_id, items=[CartItem(**i) for i in items])
 
 
+@app.get("/api/cart/{cart_id}", response_model=Cart)
+async def get_cart(cart_id: str):
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not available")
+    cart = await db["cart"].find_one_and_update(
+        {"cart_id": cart_id},
+        {"$setOnInsert": {"items": []}},
+        projection=CART_ITEMS_PROJECTION,
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return cart_from_doc(cart_id, cart)
+
+
+async def increment_cart_item(cart_id: str, line: Dict[str, str], quantity: int) -> Optional[Dict[str, Any]]:
+    return await db["cart"].find_one_and_update(
+        {"cart_id": cart_id, "items": {"$elemMatch": line}},
+        {"$inc": {"items.$.quantity": quantity}},
+        projection=CART_ITEMS_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+
+
 class AddItemPayload(BaseModel):
     product_id: str
     size: Literal["XS", "S", "M", "L", "XL", "XXL"]
@@ -230,38 +409,52 @@ class AddItemPayload(BaseModel):
 
 
 @app.post("/api/cart/{cart_id}/items", response_model=Cart)
-def add_to_cart(cart_id: str, payload: AddItemPayload):
+async def add_to_cart(cart_id: str, payload: AddItemPayload):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
-    product = db["product"].find_one({"_id": ObjectId(payload.product_id)})
+    if not _OID_RE.fullmatch(payload.product_id):
+        raise HTTPException(status_code=400, detail="Invalid product id")
+    # Only the fields copied into the cart snapshot
+    product = await db["product"].find_one(
+        {"_id": _oid(payload.product_id)},
+        {"price_cents": 1, "title": 1, "images": {"$slice": 1}},
+    )
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    if "price_cents" not in product:
+        raise HTTPException(status_code=409, detail="Product has no price")
+
+    line = {"product_id": payload.product_id, "size": payload.size}
+    new_item = {
+        **line,
+        "quantity": payload.quantity,
+        "price_cents_snapshot": int(product["price_cents"]),
+        "title_snapshot": product.get("title"),
+        "image_snapshot": (product.get("images") or [None])[0]
+    }
 
-    cart = db["cart"].find_one({"cart_id": cart_id})
-    if not cart:
-        cart = {"cart_id": cart_id, "items": []}
-
-    items: List[Dict[str, Any]] = cart.get("items", [])
     # Merge if same product+size exists
-    merged = False
-    for it in items:
-        if it["product_id"] == payload.product_id and it["size"] == payload.size:
-            it["quantity"] += payload.quantity
-            merged = True
-            break
-    if not merged:
-        items.append({
-            "product_id": payload.product_id,
-            "size": payload.size,
-            "quantity": payload.quantity,
-            "price_snapshot": float(product.get("price", 0.0)),
-            "title_snapshot": product.get("title"),
-            "image_snapshot": (product.get("images") or [None])[0]
-        })
-
-    db["cart"].update_one({"cart_id": cart_id}, {"$set": {"items": items}}, upsert=True)
-
-    return get_cart(cart_id)
+    cart = await increment_cart_item(cart_id, line, payload.quantity)
+    if cart is None:
+        # Guarded so two concurrent first-adds of a line can't both push it
+        cart = await db["cart"].find_one_and_update(
+            {"cart_id": cart_id, "items": {"$not": {"$elemMatch": line}}},
+            {"$push": {"items": new_item}},
+            projection=CART_ITEMS_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+    if cart is None:
+        # Either the cart doesn't exist yet, or a concurrent add just pushed this line
+        existing = await db["cart"].find_one_and_update(
+            {"cart_id": cart_id},
+            {"$setOnInsert": {"items": [new_item]}},
+            projection=CART_ITEMS_PROJECTION,
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+        cart = {"items": [new_item]} if existing is None else await increment_cart_item(cart_id, line, payload.quantity)
+
+    return cart_from_doc(cart_id, cart)
 
 
 class UpdateItemPayload(BaseModel):
@@ -271,26 +464,27 @@ class UpdateItemPayload(BaseModel):
 
 
 @app.put("/api/cart/{cart_id}/items", response_model=Cart)
-def update_cart_item(cart_id: str, payload: UpdateItemPayload):
+async def update_cart_item(cart_id: str, payload: UpdateItemPayload):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
-    cart = db["cart"].find_one({"cart_id": cart_id})
-    if not cart:
+    if payload.quantity > 0:
+        cart = await db["cart"].find_one_and_update(
+            {"cart_id": cart_id},
+            {"$set": {"items.$[elem].quantity": payload.quantity}},
+            projection=CART_ITEMS_PROJECTION,
+            array_filters=[{"elem.product_id": payload.product_id, "elem.size": payload.size}],
+            return_document=ReturnDocument.AFTER,
+        )
+    else:
+        cart = await db["cart"].find_one_and_update(
+            {"cart_id": cart_id},
+            {"$pull": {"items": {"product_id": payload.product_id, "size": payload.size}}},
+            projection=CART_ITEMS_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+    if cart is None:
         raise HTTPException(status_code=404, detail="Cart not found")
-
-    items: List[Dict[str, Any]] = cart.get("items", [])
-    new_items: List[Dict[str, Any]] = []
-    for it in items:
-        if it["product_id"] == payload.product_id and it["size"] == payload.size:
-            if payload.quantity > 0:
-                it["quantity"] = payload.quantity
-                new_items.append(it)
-            # if 0, remove by not appending
-        else:
-            new_items.append(it)
-
-    db["cart"].update_one({"cart_id": cart_id}, {"$set": {"items": new_items}}, upsert=True)
-    return get_cart(cart_id)
+    return cart_from_doc(cart_id, cart)
 
 
 class RemoveItemPayload(BaseModel):
@@ -299,16 +493,18 @@ class RemoveItemPayload(BaseModel):
 
 
 @app.delete("/api/cart/{cart_id}/items", response_model=Cart)
-def remove_cart_item(cart_id: str, payload: RemoveItemPayload):
+async def remove_cart_item(cart_id: str, payload: RemoveItemPayload):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
-    cart = db["cart"].find_one({"cart_id": cart_id})
-    if not cart:
+    cart = await db["cart"].find_one_and_update(
+        {"cart_id": cart_id},
+        {"$pull": {"items": {"product_id": payload.product_id, "size": payload.size}}},
+        projection=CART_ITEMS_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if cart is None:
         raise HTTPException(status_code=404, detail="Cart not found")
-    items: List[Dict[str, Any]] = cart.get("items", [])
-    items = [it for it in items if not (it["product_id"] == payload.product_id and it["size"] == payload.size)]
-    db["cart"].update_one({"cart_id": cart_id}, {"$set": {"items": items}})
-    return get_cart(cart_id)
+    return cart_from_doc(cart_id, cart)
 
 
 # ---------- Checkout / Orders ----------
@@ -318,36 +514,41 @@ class CheckoutPayload(BaseModel):
 
 
 @app.post("/api/checkout")
-def checkout(payload: CheckoutPayload):
+async def checkout(payload: CheckoutPayload):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not available")
-    cart = db["cart"].find_one({"cart_id": payload.cart_id})
-    if not cart or not cart.get("items"):
+    # Atomically empty the cart and take its prior contents, so concurrent
+    # checkouts of the same cart cannot both place an order
+    cart = await db["cart"].find_one_and_update(
+        {"cart_id": payload.cart_id, "items.0": {"$exists": True}},
+        {"$set": {"items": []}},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if cart is None:
         raise HTTPException(status_code=400, detail="Cart is empty")
 
     items = cart["items"]
-    total = 0.0
-    for it in items:
-        total += float(it.get("price_snapshot", 0)) * int(it.get("quantity", 1))
-
-    order_doc = {
-        "cart_id": payload.cart_id,
-        "items": items,
-        "total": round(total, 2),
-        "customer": payload.customer.model_dump(),
-        "status": "received",
-    }
-    inserted_id = db["order"].insert_one(order_doc).inserted_id
-
-    # Empty the cart after order
-    db["cart"].update_one({"cart_id": payload.cart_id}, {"$set": {"items": []}})
+    try:
+        total_cents = sum(it["price_cents_snapshot"] * it["quantity"] for it in items)
+        order_doc = {
+            "cart_id": payload.cart_id,
+            "items": items,
+            "total_cents": total_cents,
+            "customer": payload.customer.model_dump(),
+            "status": "received",
+        }
+        inserted_id = (await db["order"].insert_one(order_doc)).inserted_id
+    except Exception:
+        # No order was placed; give the customer their items back
+        await db["cart"].update_one({"cart_id": payload.cart_id, "items": []}, {"$set": {"items": items}})
+        raise
 
-    return {"order_id": str(inserted_id), "status": "received", "total": round(total, 2)}
+    return {"order_id": str(inserted_id), "status": "received", "total": total_cents / 100}
 
 
 # Keep test endpoint for diagnostics
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -365,7 +566,7 @@ def test_database():
             response["database_name"] = _db.name if hasattr(_db, 'name') else "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                collections = _db.list_collection_names()
+                collections = await _db.list_collection_names()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
@@ -383,4 +584,17 @@ def test_database():
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Without Redis each worker has its own in-memory cache, which the admin clear can't reach
+    default_workers = (os.cpu_count() or 1) if os.getenv("REDIS_URL") else 1
+    workers = int(os.getenv("WEB_CONCURRENCY", default_workers))
+    if workers > 1 and not os.getenv("REDIS_URL"):
+        raise SystemExit("REDIS_URL is required when running more than one worker")
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+    )
@@ -0,0 +1,67 @@
+"""
+Price Migration
+
+One-off migration from float prices to integer cents. Converts product
+`price` to `price_cents` and cart line `price_snapshot` to
+`price_cents_snapshot`. Safe to re-run; already-migrated documents are skipped.
+
+Run once after deploying the price_cents change:
+    python migrate_prices.py
+"""
+
+import asyncio
+from typing import Any, Dict
+
+from pymongo import UpdateOne
+
+
+def to_cents(price: Any) -> int:
+    return round(float(price) * 100)
+
+
+def migrate_cart_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    # Lines already in cents have no price_snapshot; leave them untouched
+    if "price_snapshot" not in item:
+        return item
+    item = dict(item)
+    item["price_cents_snapshot"] = to_cents(item.pop("price_snapshot"))
+    return item
+
+
+async def migrate_products(db) -> int:
+    """Convert product prices; returns the number of products updated"""
+    ops = [
+        UpdateOne({"_id": d["_id"]}, {"$set": {"price_cents": to_cents(d["price"])}, "$unset": {"price": ""}})
+        async for d in db["product"].find({"price": {"$exists": True}}, {"price": 1})
+    ]
+    if ops:
+        await db["product"].bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+async def migrate_carts(db) -> int:
+    """Convert cart line snapshots; returns the number of carts updated"""
+    # Filtering on the items we read means a cart changed meanwhile is left for a re-run
+    ops = [
+        UpdateOne(
+            {"_id": cart["_id"], "items": cart["items"]},
+            {"$set": {"items": [migrate_cart_item(i) for i in cart["items"]]}},
+        )
+        async for cart in db["cart"].find({"items.price_snapshot": {"$exists": True}}, {"items": 1})
+    ]
+    if ops:
+        await db["cart"].bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+async def main():
+    from database import db
+
+    if db is None:
+        raise SystemExit("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+    products, carts = await asyncio.gather(migrate_products(db), migrate_carts(db))
+    print(f"Migrated {products} products and {carts} carts to integer cents")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+import os
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+import main
+
+# Tests run on mongomock unless TEST_DATABASE_URL points at a real MongoDB
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_DATABASE_URL:
+        return
+    skip = pytest.mark.skip(reason="needs TEST_DATABASE_URL (a real MongoDB)")
+    for item in items:
+        if "mongodb" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    if TEST_DATABASE_URL:
+        name = f"shop_test_{uuid4().hex}"
+        test_db = AsyncIOMotorClient(TEST_DATABASE_URL)[name]
+    else:
+        test_db = AsyncMongoMockClient()["shop_test"]
+    monkeypatch.setattr(main, "db", test_db)
+    yield test_db
+    if TEST_DATABASE_URL:
+        MongoClient(TEST_DATABASE_URL).drop_database(name)
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    # Seeding is tested on its own; tests start from an empty database
+    async def no_seed():
+        pass
+
+    monkeypatch.setattr(main, "seed_database", no_seed)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def run(client):
+    """Run a coroutine function on the app's event loop (Motor clients are bound to one loop)"""
+    return client.portal.call
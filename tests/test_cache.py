@@ -0,0 +1,27 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+import main
+
+
+def test_admin_clear_drops_catalog_entries(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    backend = InMemoryBackend()
+    FastAPICache.init(backend, prefix="shop")
+    keys = [
+        main.catalog_key_builder(main.find_products, main.CATALOG_CACHE_NAMESPACE, kwargs={"skip": 0, "limit": 50}),
+        main.catalog_key_builder(main.find_categories, main.CATALOG_CACHE_NAMESPACE, kwargs={}),
+    ]
+    for key in keys:
+        asyncio.run(backend.set(key, "[]", 300))
+
+    client = TestClient(main.app)
+    assert client.post("/api/admin/cache/clear", headers={"x-admin-token": "wrong"}).status_code == 403
+    assert all(key in backend._store for key in keys)
+
+    response = client.post("/api/admin/cache/clear", headers={"x-admin-token": "secret"})
+    assert response.status_code == 200
+    assert not any(key in backend._store for key in keys)
@@ -0,0 +1,107 @@
+import pytest
+from bson import ObjectId
+
+import main
+
+
+def test_add_to_cart_rejects_product_without_price(db, client, run):
+    product_id = run(db["product"].insert_one, {"title": "Unpriced", "images": []}).inserted_id
+
+    response = client.post("/api/cart/c1/items", json={"product_id": str(product_id), "size": "M"})
+
+    assert response.status_code == 409
+    assert run(db["cart"].find_one, {"cart_id": "c1"}) is None
+
+
+def test_add_to_cart_snapshots_price_cents(db, client, run):
+    product_id = run(db["product"].insert_one, {"title": "Tee", "price_cents": 2900, "images": ["a.jpg"]}).inserted_id
+
+    response = client.post("/api/cart/c1/items", json={"product_id": str(product_id), "size": "M", "quantity": 2})
+
+    assert response.status_code == 200
+    assert response.json()["items"] == [{
+        "product_id": str(product_id),
+        "size": "M",
+        "quantity": 2,
+        "price_cents_snapshot": 2900,
+        "title_snapshot": "Tee",
+        "image_snapshot": "a.jpg",
+    }]
+
+
+def test_add_to_cart_unknown_product(db, client, run):
+    response = client.post("/api/cart/c1/items", json={"product_id": str(ObjectId()), "size": "M"})
+    assert response.status_code == 404
+
+
+def seed_product(db, run, price_cents=2900):
+    return str(run(db["product"].insert_one, {"title": "Tee", "price_cents": price_cents, "images": []}).inserted_id)
+
+
+def quantities(response):
+    return [(i["size"], i["quantity"]) for i in response.json()["items"]]
+
+
+def test_get_cart_creates_a_single_cart(db, client, run):
+    assert client.get("/api/cart/c1").json() == {"cart_id": "c1", "items": []}
+    assert client.get("/api/cart/c1").status_code == 200
+    assert run(db["cart"].count_documents, {"cart_id": "c1"}) == 1
+
+
+@pytest.mark.mongodb
+def test_add_to_cart_merges_same_line_and_pushes_new_ones(db, client, run):
+    product_id = seed_product(db, run)
+
+    client.post("/api/cart/c1/items", json={"product_id": product_id, "size": "M"})
+    client.post("/api/cart/c1/items", json={"product_id": product_id, "size": "M", "quantity": 2})
+    response = client.post("/api/cart/c1/items", json={"product_id": product_id, "size": "L"})
+
+    assert quantities(response) == [("M", 3), ("L", 1)]
+    assert run(db["cart"].count_documents, {"cart_id": "c1"}) == 1
+
+
+def test_add_to_cart_merges_when_a_concurrent_add_pushed_the_line(db, client, run, monkeypatch):
+    product_id = seed_product(db, run)
+    client.post("/api/cart/c1/items", json={"product_id": product_id, "size": "M"})
+    increment = main.increment_cart_item
+    calls = []
+
+    async def miss_first_increment(*args, **kwargs):
+        # The line appears only after this request's first increment attempt
+        calls.append(args)
+        return None if len(calls) == 1 else await increment(*args, **kwargs)
+
+    monkeypatch.setattr(main, "increment_cart_item", miss_first_increment)
+    response = client.post("/api/cart/c1/items", json={"product_id": product_id, "size": "M"})
+
+    assert quantities(response) == [("M", 2)]
+    assert run(db["cart"].find_one, {"cart_id": "c1"})["items"][0]["quantity"] == 2
+
+
+@pytest.mark.mongodb
+def test_update_cart_item_sets_quantity_and_removes_at_zero(db, client, run):
+    product_id = seed_product(db, run)
+    client.post("/api/cart/c1/items", json={"product_id": product_id, "size": "M"})
+    client.post("/api/cart/c1/items", json={"product_id": product_id, "size": "L"})
+
+    response = client.put("/api/cart/c1/items", json={"product_id": product_id, "size": "M", "quantity": 5})
+    assert quantities(response) == [("M", 5), ("L", 1)]
+
+    response = client.put("/api/cart/c1/items", json={"product_id": product_id, "size": "M", "quantity": 0})
+    assert quantities(response) == [("L", 1)]
+    assert run(db["cart"].find_one, {"cart_id": "c1"})["items"] == response.json()["items"]
+
+
+def test_remove_cart_item(db, client, run):
+    product_id = seed_product(db, run)
+    client.post("/api/cart/c1/items", json={"product_id": product_id, "size": "M"})
+
+    response = client.request("DELETE", "/api/cart/c1/items", json={"product_id": product_id, "size": "M"})
+
+    assert response.json() == {"cart_id": "c1", "items": []}
+
+
+def test_cart_mutations_on_missing_cart(db, client, run):
+    payload = {"product_id": str(ObjectId()), "size": "M"}
+    assert client.put("/api/cart/nope/items", json={**payload, "quantity": 2}).status_code == 404
+    assert client.request("DELETE", "/api/cart/nope/items", json=payload).status_code == 404
@@ -0,0 +1,66 @@
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+
+CUSTOMER = {
+    "name": "Ada",
+    "email": "ada@example.com",
+    "address": "1 Main St",
+    "city": "London",
+    "country": "UK",
+    "postal_code": "N1",
+}
+
+ITEM = {"product_id": "a", "size": "M", "quantity": 1, "price_cents_snapshot": 2900}
+
+
+def test_checkout_sums_integer_cents(db, client, run):
+    run(db["cart"].insert_one, {"cart_id": "c1", "items": [
+        {"product_id": "a", "size": "M", "quantity": 3, "price_cents_snapshot": 1999},
+        {"product_id": "b", "size": "L", "quantity": 1, "price_cents_snapshot": 10},
+    ]})
+
+    response = client.post("/api/checkout", json={"cart_id": "c1", "customer": CUSTOMER})
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 60.07
+    order = run(db["order"].find_one, {"cart_id": "c1"})
+    assert order["total_cents"] == 6007
+
+
+def test_checkout_empty_cart(db, client, run):
+    run(db["cart"].insert_one, {"cart_id": "c1", "items": []})
+
+    assert client.post("/api/checkout", json={"cart_id": "c1", "customer": CUSTOMER}).status_code == 400
+    assert client.post("/api/checkout", json={"cart_id": "missing", "customer": CUSTOMER}).status_code == 400
+
+
+def test_checkout_empties_cart_and_rejects_repeat(db, client, run):
+    run(db["cart"].insert_one, {"cart_id": "c1", "items": [ITEM]})
+
+    response = client.post("/api/checkout", json={"cart_id": "c1", "customer": CUSTOMER})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "received"
+    assert run(db["order"].find_one, {"_id": ObjectId(response.json()["order_id"])})["items"] == [ITEM]
+    assert run(db["cart"].find_one, {"cart_id": "c1"})["items"] == []
+    assert client.post("/api/checkout", json={"cart_id": "c1", "customer": CUSTOMER}).status_code == 400
+
+
+def test_checkout_restores_cart_when_order_insert_fails(db, client, run, monkeypatch):
+    run(db["cart"].insert_one, {"cart_id": "c1", "items": [ITEM]})
+    collection_type = type(db["order"])
+    insert_one = collection_type.insert_one
+
+    async def failing_insert_one(self, *args, **kwargs):
+        if self.name == "order":
+            raise AutoReconnect("connection lost")
+        return await insert_one(self, *args, **kwargs)
+
+    monkeypatch.setattr(collection_type, "insert_one", failing_insert_one)
+
+    with pytest.raises(AutoReconnect):
+        client.post("/api/checkout", json={"cart_id": "c1", "customer": CUSTOMER})
+
+    assert run(db["cart"].find_one, {"cart_id": "c1"})["items"] == [ITEM]
+    assert run(db["order"].count_documents, {}) == 0
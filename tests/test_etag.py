@@ -0,0 +1,15 @@
+from main import etag_matches
+
+ETAG = '"abc123"'
+
+
+def test_etag_matches_single_value():
+    assert etag_matches('"abc123"', ETAG)
+    assert not etag_matches('"other"', ETAG)
+    assert not etag_matches(None, ETAG)
+
+
+def test_etag_matches_list_weak_and_wildcard():
+    assert etag_matches('"other", "abc123"', ETAG)
+    assert etag_matches('W/"abc123"', ETAG)
+    assert etag_matches("*", ETAG)
@@ -0,0 +1,36 @@
+import asyncio
+
+from migrate_prices import migrate_carts, migrate_products
+
+
+def test_migrate_products_converts_float_prices(db):
+    async def run():
+        await db["product"].insert_many([
+            {"title": "Legacy", "price": 29.99},
+            {"title": "Current", "price_cents": 6900},
+        ])
+        migrated = await migrate_products(db)
+        docs = await db["product"].find({}, {"_id": 0}).sort("title", 1).to_list(length=None)
+        return migrated, docs, await migrate_products(db)
+
+    migrated, docs, rerun = asyncio.run(run())
+    assert migrated == 1
+    assert docs == [{"title": "Current", "price_cents": 6900}, {"title": "Legacy", "price_cents": 2999}]
+    assert rerun == 0
+
+
+def test_migrate_carts_keeps_already_migrated_lines(db):
+    async def run():
+        await db["cart"].insert_one({"cart_id": "c1", "items": [
+            {"product_id": "a", "size": "M", "quantity": 1, "price_snapshot": 19.9},
+            {"product_id": "b", "size": "L", "quantity": 2, "price_cents_snapshot": 500},
+        ]})
+        migrated = await migrate_carts(db)
+        return migrated, await db["cart"].find_one({"cart_id": "c1"})
+
+    migrated, cart = asyncio.run(run())
+    assert migrated == 1
+    assert cart["items"] == [
+        {"product_id": "a", "size": "M", "quantity": 1, "price_cents_snapshot": 1990},
+        {"product_id": "b", "size": "L", "quantity": 2, "price_cents_snapshot": 500},
+    ]
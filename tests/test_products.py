@@ -0,0 +1,10 @@
+import main
+
+
+def test_prefix_search_is_case_insensitive(db, client, run):
+    run(db["product"].insert_many, [dict(p) for p in main.SEED_PRODUCTS])
+
+    response = client.get("/api/products", params={"q": "classic*"})
+
+    assert response.status_code == 200
+    assert [p["title"] for p in response.json()] == ["Classic Logo Tee"]
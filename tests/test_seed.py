@@ -0,0 +1,18 @@
+import asyncio
+
+import main
+
+
+def test_seed_database_is_idempotent_across_workers(db, monkeypatch):
+    # Every worker may see an empty collection before any of them has seeded it
+    async def empty(self, *args, **kwargs):
+        return 0
+
+    monkeypatch.setattr(type(db["product"]), "estimated_document_count", empty)
+
+    async def seed_and_count():
+        await main.seed_database()
+        await main.seed_database()
+        return await db["category"].count_documents({}), await db["product"].count_documents({})
+
+    assert asyncio.run(seed_and_count()) == (len(main.SEED_CATEGORIES), len(main.SEED_PRODUCTS))